@@ -2,13 +2,23 @@
 配置管理模块
 处理所有环境变量和应用配置
 """
+from functools import cached_property, lru_cache
 from typing import Optional, List
 from pydantic import BaseSettings, validator
 import os
 from pathlib import Path
 
 
-class DatabaseConfig(BaseSettings):
+class _BaseSettings(BaseSettings):
+    """配置基类，统一环境变量读取方式"""
+
+    class Config:
+        env_prefix = ""
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+
+
+class DatabaseConfig(_BaseSettings):
     """数据库配置"""
     postgres_host: str = "localhost"
     postgres_port: int = 5432
@@ -29,11 +39,8 @@ class DatabaseConfig(BaseSettings):
     def postgres_url(self) -> str:
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
 
-    class Config:
-        env_prefix = ""
 
-
-class LLMConfig(BaseSettings):
+class LLMConfig(_BaseSettings):
     """大语言模型配置"""
     openai_api_key: str = ""
     anthropic_api_key: str = ""
@@ -50,11 +57,8 @@ class LLMConfig(BaseSettings):
     temperature: float = 0.1
     request_timeout: int = 60
 
-    class Config:
-        env_prefix = ""
-
 
-class VectorStoreConfig(BaseSettings):
+class VectorStoreConfig(_BaseSettings):
     """向量存储配置"""
     pinecone_api_key: str = ""
     pinecone_environment: str = ""
@@ -64,12 +68,27 @@ class VectorStoreConfig(BaseSettings):
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     vector_dimension: int = 384
     similarity_threshold: float = 0.7
-
-    class Config:
-        env_prefix = ""
-
-
-class DataSourceConfig(BaseSettings):
+    embedding_batch_size: int = 64
+    write_batch_size: int = 256
+    max_input_chars: int = 1000  # 参与embedding的正文最大字符数，约对应模型512 token上限
+    embedding_backend: str = "torch"  # torch, torch-int8, onnx-int8, openvino, model2vec
+    model2vec_model: str = "minishlab/M2V_base_output"  # 使用时需同步调整vector_dimension
+    embedding_precision: str = "fp32"  # fp32, fp16, bf16（仅在torch后端且有GPU时生效）
+    embedding_compile: bool = False  # torch后端使用torch.compile编译并预热
+    onnx_quantization: str = "avx512_vnni"  # arm64, avx2, avx512, avx512_vnni
+    query_cache_size: int = 1024
+    int8_index_enabled: bool = False  # 使用本地int8量化索引加速无过滤条件的搜索
+    faiss_index_enabled: bool = False  # 使用进程内FAISS HNSW索引处理无过滤条件的搜索（优先于int8索引）
+
+    @validator('embedding_precision')
+    def validate_embedding_precision(cls, v):
+        valid_precisions = ['fp32', 'fp16', 'bf16']
+        if v.lower() not in valid_precisions:
+            raise ValueError(f'embedding_precision must be one of {valid_precisions}')
+        return v.lower()
+
+
+class DataSourceConfig(_BaseSettings):
     """数据源配置"""
     twitter_bearer_token: str = ""
     linkedin_access_token: str = ""
@@ -91,11 +110,8 @@ class DataSourceConfig(BaseSettings):
         "social": 1800   # 30分钟
     }
 
-    class Config:
-        env_prefix = ""
 
-
-class ProcessingConfig(BaseSettings):
+class ProcessingConfig(_BaseSettings):
     """内容处理配置"""
     max_summary_length: int = 500
     min_content_quality_score: float = 0.7
@@ -109,22 +125,16 @@ class ProcessingConfig(BaseSettings):
     similarity_threshold: float = 0.85
     min_content_length: int = 100
 
-    class Config:
-        env_prefix = ""
-
 
-class APIConfig(BaseSettings):
+class APIConfig(_BaseSettings):
     """API服务配置"""
     host: str = "0.0.0.0"
     port: int = 8000
     api_rate_limit: int = 100
     cors_origins: List[str] = ["*"]
 
-    class Config:
-        env_prefix = ""
-
 
-class EmailConfig(BaseSettings):
+class EmailConfig(_BaseSettings):
     """邮件配置"""
     smtp_host: str = "smtp.gmail.com"
     smtp_port: int = 587
@@ -133,25 +143,13 @@ class EmailConfig(BaseSettings):
     from_email: str = ""
     from_name: str = "AI News Agent"
 
-    class Config:
-        env_prefix = ""
-
 
-class AppConfig(BaseSettings):
+class AppConfig(_BaseSettings):
     """主应用配置"""
     debug: bool = False
     log_level: str = "INFO"
     timezone: str = "Asia/Shanghai"
     
-    # 组件配置
-    database: DatabaseConfig = DatabaseConfig()
-    llm: LLMConfig = LLMConfig()
-    vector_store: VectorStoreConfig = VectorStoreConfig()
-    data_source: DataSourceConfig = DataSourceConfig()
-    processing: ProcessingConfig = ProcessingConfig()
-    api: APIConfig = APIConfig()
-    email: EmailConfig = EmailConfig()
-    
     # 项目路径
     project_root: Path = Path(__file__).parent.parent.parent
     data_dir: Path = project_root / "data"
@@ -165,17 +163,61 @@ class AppConfig(BaseSettings):
             raise ValueError(f'log_level must be one of {valid_levels}')
         return v.upper()
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # 确保目录存在
+    # 组件配置（首次访问时才创建）
+    @cached_property
+    def database(self) -> DatabaseConfig:
+        return DatabaseConfig()
+
+    @cached_property
+    def llm(self) -> LLMConfig:
+        return LLMConfig()
+
+    @cached_property
+    def vector_store(self) -> VectorStoreConfig:
+        return VectorStoreConfig()
+
+    @cached_property
+    def data_source(self) -> DataSourceConfig:
+        return DataSourceConfig()
+
+    @cached_property
+    def processing(self) -> ProcessingConfig:
+        return ProcessingConfig()
+
+    @cached_property
+    def api(self) -> APIConfig:
+        return APIConfig()
+
+    @cached_property
+    def email(self) -> EmailConfig:
+        return EmailConfig()
+
+    def _iter(self, *args, **kwargs):
+        # cached_property把子配置缓存在__dict__中，dict()/json()只输出字段本身
+        for key, value in super()._iter(*args, **kwargs):
+            if key not in _SUB_CONFIG_NAMES:
+                yield key, value
+
+    def __repr_args__(self):
+        return [(key, value) for key, value in super().__repr_args__() if key not in _SUB_CONFIG_NAMES]
+
+    def ensure_dirs(self):
+        """确保数据、日志和配置目录存在"""
         self.data_dir.mkdir(exist_ok=True)
         self.logs_dir.mkdir(exist_ok=True)
         self.config_dir.mkdir(exist_ok=True)
 
     class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+        keep_untouched = (cached_property,)
+
+
+# AppConfig中按需创建的子配置名称
+_SUB_CONFIG_NAMES = frozenset(
+    name for name, attr in vars(AppConfig).items() if isinstance(attr, cached_property)
+)
 
 
-# 全局配置实例
-config = AppConfig()
+@lru_cache(maxsize=1)
+def get_settings() -> AppConfig:
+    """获取全局配置实例（首次调用时创建并缓存）"""
+    return AppConfig()
@@ -5,11 +5,23 @@
 import sys
 from pathlib import Path
 from loguru import logger
-from .config import config
+from .config import get_settings
+
+
+def _is_performance_record(record) -> bool:
+    """性能日志过滤器"""
+    return "PERFORMANCE" in record["extra"]
+
+
+def _is_agent_decision_record(record) -> bool:
+    """Agent决策日志过滤器"""
+    return "AGENT_DECISION" in record["extra"]
 
 
 def setup_logging():
     """设置应用日志配置"""
+    config = get_settings()
+    config.ensure_dirs()
     
     # 移除默认的日志处理器
     logger.remove()
@@ -30,6 +42,9 @@ def setup_logging():
         "{message}"
     )
     
+    # 所有处理器均使用enqueue=True，由后台线程批量写入（含文件轮转压缩），
+    # 调用方只需将日志放入队列
+    
     # 控制台日志
     logger.add(
         sys.stdout,
@@ -37,7 +52,8 @@ def setup_logging():
         level=config.log_level,
         colorize=True,
         backtrace=True,
-        diagnose=True
+        diagnose=True,
+        enqueue=True
     )
     
     # 应用日志文件
@@ -48,7 +64,9 @@ def setup_logging():
         rotation="100 MB",
         retention="30 days",
         compression="zip",
-        encoding="utf-8"
+        encoding="utf-8",
+        enqueue=True,
+        buffering=8192
     )
     
     # 错误日志文件
@@ -59,7 +77,9 @@ def setup_logging():
         rotation="50 MB",
         retention="90 days",
         compression="zip",
-        encoding="utf-8"
+        encoding="utf-8",
+        enqueue=True,
+        buffering=8192
     )
     
     # 性能日志文件
@@ -69,8 +89,10 @@ def setup_logging():
         level="INFO",
         rotation="50 MB",
         retention="7 days",
-        filter=lambda record: "PERFORMANCE" in record["extra"],
-        encoding="utf-8"
+        filter=_is_performance_record,
+        encoding="utf-8",
+        enqueue=True,
+        buffering=8192
     )
     
     # Agent决策日志
@@ -80,8 +102,10 @@ def setup_logging():
         level="INFO",
         rotation="50 MB",
         retention="30 days",
-        filter=lambda record: "AGENT_DECISION" in record["extra"],
-        encoding="utf-8"
+        filter=_is_agent_decision_record,
+        encoding="utf-8",
+        enqueue=True,
+        buffering=8192
     )
     
     logger.info("日志系统初始化完成")
@@ -92,29 +116,36 @@ def get_logger(name: str):
     return logger.bind(name=name)
 
 
-# 特定用途的logger
+# 特定用途的logger（只绑定一次，避免每次调用都创建新的bound logger）
+_performance_logger = logger.bind(PERFORMANCE=True)
+_agent_decision_logger = logger.bind(AGENT_DECISION=True)
+
+
 def log_performance(message: str, **kwargs):
     """记录性能日志"""
-    logger.bind(PERFORMANCE=True).info(message, **kwargs)
+    _performance_logger.info(message, **kwargs)
 
 
 def log_agent_decision(agent_name: str, decision: str, context: dict):
-    """记录Agent决策日志"""
-    logger.bind(AGENT_DECISION=True).info(
-        f"Agent: {agent_name} | Decision: {decision} | Context: {context}"
+    """记录Agent决策日志（context仅在日志级别启用时才格式化）"""
+    _agent_decision_logger.opt(lazy=True).info(
+        "Agent: {} | Decision: {} | Context: {}",
+        lambda: agent_name, lambda: decision, lambda: context
     )
 
 
 def log_source_quality(source: str, score: float, details: dict):
     """记录信源质量评分日志"""
-    logger.info(
-        f"信源质量评分 - Source: {source} | Score: {score:.3f} | Details: {details}"
+    logger.opt(lazy=True).info(
+        "信源质量评分 - Source: {} | Score: {:.3f} | Details: {}",
+        lambda: source, lambda: score, lambda: details
     )
 
 
 def log_content_processing(content_id: str, stage: str, status: str, details: dict = None):
     """记录内容处理日志"""
-    message = f"内容处理 - ID: {content_id} | Stage: {stage} | Status: {status}"
-    if details:
-        message += f" | Details: {details}"
-    logger.info(message)
+    logger.opt(lazy=True).info(
+        "内容处理 - ID: {} | Stage: {} | Status: {}{}",
+        lambda: content_id, lambda: stage, lambda: status,
+        lambda: f" | Details: {details}" if details else ""
+    )
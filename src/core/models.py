@@ -2,12 +2,35 @@
 数据模型定义
 定义项目中使用的核心数据结构
 """
+import os
+import random
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, Sequence
 from enum import Enum
 from pydantic import BaseModel, Field, validator
 from uuid import UUID, uuid4
 
+from .exceptions import ScoringException
+
+if TYPE_CHECKING:
+    from .models_internal import ContentItemRaw
+
+
+# ID专用的随机数生成器：不受random.seed()影响，从系统随机源取种子，fork后在子进程中重新播种
+_id_rng = random.Random()
+os.register_at_fork(after_in_child=_id_rng.seed)
+
+
+def generate_id() -> str:
+    """生成按时间有序的唯一ID（ULID风格）
+    
+    由毫秒时间戳(48位)和随机数(80位)组成，共32位十六进制字符。
+    同一毫秒内两个ID冲突的概率约为2^-80，可视为唯一，但不作绝对保证。
+    """
+    millis = time.time_ns() // 1_000_000
+    return f"{millis:012x}{_id_rng.getrandbits(80):020x}"
+
 
 class ContentType(str, Enum):
     """内容类型枚举"""
@@ -43,6 +66,36 @@ class QualityLevel(str, Enum):
     MEDIUM = "medium"
     LOW = "low"
     VERY_LOW = "very_low"
+    
+    @classmethod
+    def from_scores(cls, scores: Sequence[float]) -> List["QualityLevel"]:
+        """批量根据质量评分计算质量等级，供评分流水线按批次调用"""
+        import numpy as np
+        
+        values = np.asarray(scores, dtype=float)
+        # np.digitize会把NaN归入最高一档
+        if np.isnan(values).any():
+            raise ScoringException("质量评分中包含NaN", details={"scores": list(scores)})
+        
+        levels = np.array([cls.VERY_LOW, cls.LOW, cls.MEDIUM, cls.HIGH], dtype=object)
+        indices = np.digitize(values, _QUALITY_LEVEL_THRESHOLDS)
+        return levels[indices].tolist()
+
+
+# 质量等级分界线，与quality_level_for_score保持一致
+_QUALITY_LEVEL_THRESHOLDS = (0.3, 0.6, 0.8)
+
+
+def quality_level_for_score(score: float) -> QualityLevel:
+    """根据质量评分计算质量等级"""
+    if score >= 0.8:
+        return QualityLevel.HIGH
+    elif score >= 0.6:
+        return QualityLevel.MEDIUM
+    elif score >= 0.3:
+        return QualityLevel.LOW
+    else:
+        return QualityLevel.VERY_LOW
 
 
 class DataSource(BaseModel):
@@ -63,9 +116,13 @@ class DataSource(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# ContentItem中在ContentItemRaw里以元组存储的列表字段
+_SEQUENCE_FIELDS = ("authors", "tags", "categories")
+
+
 class ContentItem(BaseModel):
     """内容项模型"""
-    id: str = Field(default_factory=lambda: str(uuid4()))
+    id: str = Field(default_factory=generate_id)
     title: str
     content: str
     summary: Optional[str] = None
@@ -102,16 +159,36 @@ class ContentItem(BaseModel):
     @validator('quality_level', pre=True, always=True)
     def set_quality_level(cls, v, values):
         if v is None and 'quality_score' in values:
-            score = values['quality_score']
-            if score >= 0.8:
-                return QualityLevel.HIGH
-            elif score >= 0.6:
-                return QualityLevel.MEDIUM
-            elif score >= 0.3:
-                return QualityLevel.LOW
-            else:
-                return QualityLevel.VERY_LOW
+            return quality_level_for_score(values['quality_score'])
         return v
+    
+    @classmethod
+    def from_trusted(cls, **fields) -> "ContentItem":
+        """从可信数据快速构建ContentItem
+        
+        跳过pydantic校验（类型转换、范围检查），仅补齐quality_level，
+        适用于结构稳定的上游数据（如ArXiv API）；不可信来源仍应使用ContentItem(...)。
+        """
+        if fields.get("quality_level") is None:
+            fields["quality_level"] = quality_level_for_score(fields.get("quality_score", 0.0))
+        return cls.construct(**fields)
+    
+    @classmethod
+    def from_raw(cls, raw: "ContentItemRaw") -> "ContentItem":
+        """从内部传输结构ContentItemRaw转换"""
+        fields = {name: getattr(raw, name) for name in raw.__slots__}
+        for name in _SEQUENCE_FIELDS:
+            fields[name] = list(fields[name])
+        return cls.from_trusted(**fields)
+    
+    def to_raw(self) -> "ContentItemRaw":
+        """转换为内部传输结构ContentItemRaw"""
+        from .models_internal import ContentItemRaw
+        
+        fields = {name: getattr(self, name) for name in ContentItemRaw.__slots__}
+        for name in _SEQUENCE_FIELDS:
+            fields[name] = tuple(fields[name])
+        return ContentItemRaw(**fields)
 
 
 class ProcessedContent(BaseModel):
@@ -194,7 +271,7 @@ class RecommendationResult(BaseModel):
 
 class AgentTask(BaseModel):
     """智能体任务模型"""
-    id: str = Field(default_factory=lambda: str(uuid4()))
+    id: str = Field(default_factory=generate_id)
     task_type: str
     priority: int = Field(default=1, ge=1, le=10)
     parameters: Dict[str, Any] = Field(default_factory=dict)
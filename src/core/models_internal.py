@@ -0,0 +1,71 @@
+"""
+内部数据模型定义
+工具之间传递数据使用的轻量结构，仅在API/数据库边界转换为pydantic模型
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Protocol, Sequence, Tuple
+
+from .models import ContentType, ProcessingStatus, QualityLevel, generate_id
+
+
+class ContentRecord(Protocol):
+    """ContentItem与ContentItemRaw共有的只读接口"""
+    id: str
+    title: str
+    content: str
+    summary: Optional[str]
+    url: str
+    content_type: ContentType
+    source_id: str
+    source_name: str
+    authors: Sequence[str]
+    tags: Sequence[str]
+    categories: Sequence[str]
+    language: str
+    published_at: datetime
+    quality_score: float
+    metadata: Dict[str, Any]
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class ContentItemRaw:
+    """内容项（内部传输用）
+
+    字段与ContentItem一致，不做校验，列表字段使用元组。
+    通过ContentItem.from_raw() / ContentItem.to_raw()与pydantic模型互转。
+    metadata为可变字典，不按字段比较和哈希（eq=False），按对象身份比较，可放入集合。
+    """
+    title: str
+    content: str
+    url: str
+    content_type: ContentType
+    source_id: str
+    source_name: str
+    published_at: datetime
+    id: str = field(default_factory=generate_id)
+    summary: Optional[str] = None
+
+    # 元数据
+    authors: Tuple[str, ...] = ()
+    tags: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+    language: str = "en"
+
+    # 时间信息
+    collected_at: datetime = field(default_factory=datetime.utcnow)
+    processed_at: Optional[datetime] = None
+
+    # 质量和评分
+    quality_score: float = 0.0
+    quality_level: Optional[QualityLevel] = None
+    relevance_score: float = 0.0
+    importance_score: float = 0.0
+
+    # 处理状态
+    processing_status: ProcessingStatus = ProcessingStatus.PENDING
+    error_message: Optional[str] = None
+
+    # 额外信息
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    raw_data: Optional[Dict[str, Any]] = None
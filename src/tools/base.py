@@ -2,13 +2,18 @@
 Langchain工具基类
 定义项目中使用的各种工具的基类和接口
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, Iterator, List, Optional, Type
 from langchain.tools import BaseTool
-from langchain.callbacks.manager import CallbackManagerForToolRun
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
 from pydantic import BaseModel, Field
 
 from ..core.models import DataSource, ContentItem
+from ..core.models_internal import ContentRecord
 from ..core.logging import get_logger
 from ..core.exceptions import NewsAgentException
 
@@ -60,6 +65,37 @@ class NewsAgentBaseTool(BaseTool, ABC):
     ) -> ToolResult:
         """子类需要实现的具体执行逻辑"""
         pass
+    
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> ToolResult:
+        """异步运行工具的主要方法"""
+        try:
+            self.logger.info(f"开始异步执行工具: {self.name}, 查询: {query}")
+            
+            result = await self._aexecute(query, run_manager)
+            
+            self.logger.info(f"工具异步执行成功: {self.name}")
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"工具异步执行失败: {self.name}, 错误: {str(e)}")
+            return ToolResult(
+                success=False,
+                error=str(e),
+                metadata={"tool_name": self.name, "query": query}
+            )
+    
+    async def _aexecute(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> ToolResult:
+        """异步执行逻辑，默认在线程池中运行同步的_execute，I/O密集型工具应覆盖此方法"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._execute, query, None)
 
 
 class DataSourceTool(NewsAgentBaseTool):
@@ -70,10 +106,14 @@ class DataSourceTool(NewsAgentBaseTool):
         self.source_config = source_config
     
     @abstractmethod
-    def fetch_content(self, **kwargs) -> List[ContentItem]:
-        """获取内容的抽象方法"""
+    def fetch_content(self, **kwargs) -> List[ContentRecord]:
+        """获取内容的抽象方法，返回ContentItem或ContentItemRaw"""
         pass
     
+    def iter_content(self, **kwargs) -> Iterator[ContentRecord]:
+        """逐条获取内容，支持流式获取的数据源应覆盖此方法"""
+        yield from self.fetch_content(**kwargs)
+    
     @abstractmethod
     def validate_connection(self) -> bool:
         """验证连接的抽象方法"""
@@ -107,8 +147,8 @@ class StorageTool(NewsAgentBaseTool):
     """存储工具基类"""
     
     @abstractmethod
-    def store_content(self, content: ContentItem) -> str:
-        """存储内容的抽象方法"""
+    def store_content(self, content: ContentRecord) -> str:
+        """存储内容的抽象方法，接受ContentItem或ContentItemRaw"""
         pass
     
     @abstractmethod
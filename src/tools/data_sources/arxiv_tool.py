@@ -2,25 +2,65 @@
 ArXiv数据源工具
 从ArXiv获取AI/ML相关论文
 """
+import re
+import sys
+import threading
+import time
+import aiohttp
 import arxiv
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from langchain.callbacks.manager import CallbackManagerForToolRun
+import feedparser
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
 
 from .base import DataSourceTool, ToolResult
-from ..core.models import ContentItem, ContentType, DataSource
+from ..core.models import ContentType, DataSource
+from ..core.models_internal import ContentItemRaw
 from ..core.exceptions import DataSourceException
 
 
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+
+# 连接验证结果的缓存时间(秒)
+VALIDATION_TTL = 60
+
+# 查询字符串解析，例如 "max_results:100 days_back:7 categories:cs.AI,cs.CL"
+_QUERY_PATTERN = re.compile(r"(?P<key>\w+):(?P<value>\S+)")
+_QUERY_DEFAULTS: Dict[str, Any] = {
+    "max_results": 50,
+    "days_back": 1,
+    "categories": None
+}
+_QUERY_COERCERS = {
+    "max_results": int,
+    "days_back": int,
+    "categories": lambda value: value.split(","),
+}
+
+# 按source_config.id缓存的(创建参数, 工具实例)，复用arxiv.Client及其HTTP连接
+_INSTANCES: Dict[str, Tuple[Dict[str, Any], "ArxivTool"]] = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
 class ArxivTool(DataSourceTool):
     """ArXiv论文获取工具"""
     
     name = "arxiv_fetcher"
     description = "从ArXiv获取AI/ML领域的最新论文"
     
-    def __init__(self, source_config: DataSource, **kwargs):
+    def __init__(self, source_config: DataSource, include_raw: bool = False, **kwargs):
         super().__init__(source_config, **kwargs)
-        self.client = arxiv.Client()
+        # 是否保留原始ArXiv结果（与内容项字段大量重复，默认不保留）
+        self.include_raw = include_raw
+        # 复用同一个客户端，按页批量拉取以减少HTTP往返
+        self.client = arxiv.Client(page_size=100, delay_seconds=3, num_retries=3)
+        
+        # 连接验证结果缓存
+        self._last_validated_at = float("-inf")
+        self._last_validated_ok = False
         
         # ArXiv相关分类
         self.ai_categories = [
@@ -31,6 +71,28 @@ class ArxivTool(DataSourceTool):
             "cs.NE",    # Neural and Evolutionary Computing
             "stat.ML",  # Machine Learning (Statistics)
         ]
+        self._default_category_query = " OR ".join(f"cat:{cat}" for cat in self.ai_categories)
+    
+    @classmethod
+    def for_source(cls, source_config: DataSource, **kwargs) -> "ArxivTool":
+        """获取指定数据源的共享工具实例，首次调用时创建
+        
+        同一数据源以不同参数再次获取时抛出DataSourceException，避免静默返回按旧参数创建的实例。
+        """
+        with _INSTANCES_LOCK:
+            cached = _INSTANCES.get(source_config.id)
+            if cached is None:
+                tool = cls(source_config, **kwargs)
+                _INSTANCES[source_config.id] = (kwargs, tool)
+                return tool
+            
+            cached_kwargs, tool = cached
+            if kwargs != cached_kwargs:
+                raise DataSourceException(
+                    f"数据源 {source_config.id} 的共享实例已按参数 {cached_kwargs} 创建，"
+                    f"不能以 {kwargs} 重新获取"
+                )
+            return tool
     
     def _execute(
         self,
@@ -61,69 +123,169 @@ class ArxivTool(DataSourceTool):
         days_back: int = 1,
         categories: Optional[List[str]] = None,
         **kwargs
-    ) -> List[ContentItem]:
+    ) -> List[ContentItemRaw]:
         """从ArXiv获取内容"""
+        return list(self.iter_content(max_results, days_back, categories, **kwargs))
+    
+    def iter_content(
+        self,
+        max_results: int = 50,
+        days_back: int = 1,
+        categories: Optional[List[str]] = None,
+        **kwargs
+    ) -> Iterator[ContentItemRaw]:
+        """逐条从ArXiv获取内容，下游无需等待整批结果即可开始处理"""
         
-        categories = categories or self.ai_categories
-        content_items = []
-        
-        # 构建搜索查询
-        category_query = " OR ".join([f"cat:{cat}" for cat in categories])
-        
-        # 时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
+        search_query = self._build_search_query(categories, days_back)
+        count = 0
         
         try:
             # 执行搜索
             search = arxiv.Search(
-                query=category_query,
+                query=search_query,
                 max_results=max_results,
                 sort_by=arxiv.SortCriterion.SubmittedDate,
                 sort_order=arxiv.SortOrder.Descending
             )
             
             for paper in self.client.results(search):
-                # 检查时间范围
-                if paper.published < start_date:
-                    continue
-                
-                content_item = self._convert_to_content_item(paper)
-                content_items.append(content_item)
-                
-            self.logger.info(f"从ArXiv获取到 {len(content_items)} 篇论文")
-            return content_items
+                count += 1
+                yield self._convert_to_content_item(paper)
             
         except Exception as e:
             self.logger.error(f"ArXiv内容获取失败: {str(e)}")
             raise DataSourceException(f"ArXiv API错误: {str(e)}")
+        
+        self.logger.info(f"从ArXiv获取到 {count} 篇论文")
     
-    def _convert_to_content_item(self, paper: arxiv.Result) -> ContentItem:
-        """将ArXiv论文转换为ContentItem"""
+    def _build_search_query(self, categories: Optional[List[str]], days_back: int) -> str:
+        """构建包含分类和提交时间范围的ArXiv查询"""
+        # 时间范围（ArXiv提交时间为UTC）
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days_back)
         
-        # 提取作者信息
-        authors = [author.name for author in paper.authors]
+        # 构建搜索查询，将时间过滤下推到ArXiv端
+        if categories:
+            category_query = " OR ".join(f"cat:{cat}" for cat in categories)
+        else:
+            category_query = self._default_category_query
+        return (
+            f"({category_query}) AND "
+            f"submittedDate:[{start_date:%Y%m%d}0000 TO {end_date:%Y%m%d}2359]"
+        )
+    
+    async def _aexecute(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> ToolResult:
+        """异步执行ArXiv查询"""
+        try:
+            params = self._parse_query(query)
+            content_items = await self.afetch_content(**params)
+            
+            return ToolResult(
+                success=True,
+                data=content_items,
+                metadata={
+                    "source": "arxiv",
+                    "count": len(content_items),
+                    "categories": self.ai_categories
+                }
+            )
+        except Exception as e:
+            raise DataSourceException(f"ArXiv异步查询失败: {str(e)}")
+    
+    async def afetch_content(
+        self,
+        max_results: int = 50,
+        days_back: int = 1,
+        categories: Optional[List[str]] = None,
+        **kwargs
+    ) -> List[ContentItemRaw]:
+        """直接请求ArXiv API异步获取内容，不阻塞事件循环"""
         
-        # 提取分类信息
-        categories = [cat.strip() for cat in paper.categories]
+        params = {
+            "search_query": self._build_search_query(categories, days_back),
+            "start": 0,
+            "max_results": max_results,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        }
         
-        # 构建完整内容
-        content_parts = [
-            f"标题: {paper.title}",
-            f"作者: {', '.join(authors)}",
-            f"摘要: {paper.summary}",
-        ]
+        try:
+            # 会话绑定创建它的事件循环，每次调用单独创建并在结束时关闭
+            async with aiohttp.ClientSession() as session:
+                async with session.get(ARXIV_API_URL, params=params) as resp:
+                    resp.raise_for_status()
+                    body = await resp.text()
+            
+            feed = feedparser.parse(body)
+            content_items = [self._convert_entry_to_content_item(entry) for entry in feed.entries]
+            
+            self.logger.info(f"从ArXiv异步获取到 {len(content_items)} 篇论文")
+            return content_items
+            
+        except Exception as e:
+            self.logger.error(f"ArXiv异步内容获取失败: {str(e)}")
+            raise DataSourceException(f"ArXiv API错误: {str(e)}")
+    
+    def _convert_to_content_item(self, paper: arxiv.Result) -> ContentItemRaw:
+        """将ArXiv论文转换为ContentItemRaw"""
+        return self._build_content_item(
+            title=paper.title,
+            summary=paper.summary,
+            authors=tuple(author.name for author in paper.authors),
+            categories=paper.categories,
+            comment=paper.comment,
+            pdf_url=paper.pdf_url,
+            published_at=paper.published,
+            metadata={
+                "arxiv_id": paper.get_short_id(),
+                "doi": paper.doi,
+                "primary_category": paper.primary_category,
+                "journal_ref": paper.journal_ref,
+                "links": [link.href for link in paper.links],
+                "pdf_url": paper.pdf_url,
+                "entry_id": paper.entry_id,
+            },
+            raw_data=self._build_raw_data(paper) if self.include_raw else None
+        )
+    
+    def _build_content_item(
+        self,
+        title: str,
+        summary: str,
+        authors: Tuple[str, ...],
+        categories: Iterable[str],
+        comment: Optional[str],
+        pdf_url: str,
+        published_at: datetime,
+        metadata: Dict[str, Any],
+        raw_data: Optional[Dict[str, Any]]
+    ) -> ContentItemRaw:
+        """构建ContentItemRaw，同步(arxiv库)与异步(feedparser)两条路径共用
         
-        if paper.comment:
-            content_parts.append(f"备注: {paper.comment}")
+        ArXiv返回的数据结构稳定可信，直接构建轻量的内部结构，不经过pydantic校验；
+        需要时在API/数据库边界通过ContentItem.from_raw()转换。
+        """
         
-        full_content = "\n\n".join(content_parts)
+        # 提取分类信息（驻留字符串，大量论文共享同一批分类名）
+        # 元数据需要JSON序列化，不存放集合；需要成员判断时由调用方对categories按需构建
+        categories = tuple(sys.intern(cat.strip()) for cat in categories)
         
-        return ContentItem(
-            title=paper.title,
+        # 构建完整内容
+        authors_str = ", ".join(authors)
+        full_content = (
+            f"标题: {title}\n\n作者: {authors_str}\n\n摘要: {summary}"
+            + (f"\n\n备注: {comment}" if comment else "")
+        )
+        
+        return ContentItemRaw(
+            title=title,
             content=full_content,
-            summary=paper.summary,
-            url=paper.pdf_url,
+            summary=summary,
+            url=pdf_url,
             content_type=ContentType.ACADEMIC_PAPER,
             source_id=self.source_config.id,
             source_name=self.source_config.name,
@@ -131,36 +293,87 @@ class ArxivTool(DataSourceTool):
             categories=categories,
             tags=categories,  # 使用分类作为标签
             language="en",
-            published_at=paper.published,
-            metadata={
-                "arxiv_id": paper.get_short_id(),
+            published_at=published_at,
+            metadata=metadata,
+            raw_data=raw_data
+        )
+    
+    def _build_raw_data(self, paper: arxiv.Result) -> Dict[str, Any]:
+        """构建原始ArXiv结果数据"""
+        return {
+            "arxiv_result": {
+                "entry_id": paper.entry_id,
+                "updated": paper.updated.isoformat() if paper.updated else None,
+                "published": paper.published.isoformat(),
+                "title": paper.title,
+                "authors": [{"name": a.name} for a in paper.authors],
+                "summary": paper.summary,
+                "comment": paper.comment,
+                "journal_ref": paper.journal_ref,
                 "doi": paper.doi,
                 "primary_category": paper.primary_category,
-                "journal_ref": paper.journal_ref,
-                "links": [link.href for link in paper.links],
-                "pdf_url": paper.pdf_url,
-                "entry_id": paper.entry_id
-            },
-            raw_data={
-                "arxiv_result": {
-                    "entry_id": paper.entry_id,
-                    "updated": paper.updated.isoformat() if paper.updated else None,
-                    "published": paper.published.isoformat(),
-                    "title": paper.title,
-                    "authors": [{"name": a.name} for a in paper.authors],
-                    "summary": paper.summary,
-                    "comment": paper.comment,
-                    "journal_ref": paper.journal_ref,
-                    "doi": paper.doi,
-                    "primary_category": paper.primary_category,
-                    "categories": paper.categories,
-                    "links": [{"href": link.href, "title": link.title} for link in paper.links]
-                }
+                "categories": paper.categories,
+                "links": [{"href": link.href, "title": link.title} for link in paper.links]
             }
+        }
+    
+    def _convert_entry_to_content_item(self, entry: Any) -> ContentItemRaw:
+        """将ArXiv Atom条目(feedparser)转换为ContentItemRaw"""
+        
+        title = re.sub(r"\s+", " ", entry.title).strip()
+        summary = entry.summary.strip()
+        links = entry.get("links", [])
+        pdf_url = next(
+            (link.href for link in links if link.get("title") == "pdf"),
+            entry.id
+        )
+        
+        return self._build_content_item(
+            title=title,
+            summary=summary,
+            authors=tuple(author.name for author in entry.get("authors", [])),
+            categories=[tag["term"] for tag in entry.get("tags", [])],
+            comment=entry.get("arxiv_comment"),
+            pdf_url=pdf_url,
+            published_at=datetime(*entry.published_parsed[:6], tzinfo=timezone.utc),
+            metadata={
+                "arxiv_id": entry.id.split("/abs/")[-1],
+                "doi": entry.get("arxiv_doi"),
+                "primary_category": entry.get("arxiv_primary_category", {}).get("term"),
+                "journal_ref": entry.get("arxiv_journal_ref"),
+                "links": [link.href for link in links],
+                "pdf_url": pdf_url,
+                "entry_id": entry.id,
+            },
+            raw_data=self._build_entry_raw_data(entry) if self.include_raw else None
         )
     
+    def _build_entry_raw_data(self, entry: Any) -> Dict[str, Any]:
+        """构建原始ArXiv条目数据，结构与_build_raw_data一致"""
+        updated = entry.get("updated_parsed")
+        return {
+            "arxiv_result": {
+                "entry_id": entry.id,
+                "updated": datetime(*updated[:6], tzinfo=timezone.utc).isoformat() if updated else None,
+                "published": datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).isoformat(),
+                "title": entry.title,
+                "authors": [{"name": author.name} for author in entry.get("authors", [])],
+                "summary": entry.summary,
+                "comment": entry.get("arxiv_comment"),
+                "journal_ref": entry.get("arxiv_journal_ref"),
+                "doi": entry.get("arxiv_doi"),
+                "primary_category": entry.get("arxiv_primary_category", {}).get("term"),
+                "categories": [tag["term"] for tag in entry.get("tags", [])],
+                "links": [{"href": link.href, "title": link.get("title")} for link in entry.get("links", [])]
+            }
+        }
+    
     def validate_connection(self) -> bool:
-        """验证ArXiv连接"""
+        """验证ArXiv连接，结果在VALIDATION_TTL秒内复用"""
+        now = time.monotonic()
+        if now - self._last_validated_at < VALIDATION_TTL:
+            return self._last_validated_ok
+        
         try:
             # 执行一个简单的测试查询
             search = arxiv.Search(
@@ -169,34 +382,40 @@ class ArxivTool(DataSourceTool):
             )
             
             results = list(self.client.results(search))
-            return len(results) > 0
+            ok = len(results) > 0
             
         except Exception as e:
             self.logger.error(f"ArXiv连接验证失败: {str(e)}")
-            return False
+            ok = False
+        
+        self._last_validated_at = now
+        self._last_validated_ok = ok
+        return ok
     
     def _parse_query(self, query: str) -> Dict[str, Any]:
-        """解析查询字符串"""
-        # 默认参数
-        params = {
-            "max_results": 50,
-            "days_back": 1,
-            "categories": None
-        }
+        """解析查询字符串，未识别的键会被忽略"""
+        params = dict(_QUERY_DEFAULTS)
         
-        # 这里可以添加更复杂的查询解析逻辑
-        # 例如解析 "max_results:100 days_back:7" 这样的查询
+        for match in _QUERY_PATTERN.finditer(query):
+            key = match["key"]
+            coerce = _QUERY_COERCERS.get(key)
+            if coerce is None:
+                continue
+            try:
+                params[key] = coerce(match["value"])
+            except ValueError:
+                raise DataSourceException(f"无效的查询参数: {match.group(0)}")
         
         return params
     
-    def get_recent_papers(self, hours: int = 24) -> List[ContentItem]:
+    def get_recent_papers(self, hours: int = 24) -> List[ContentItemRaw]:
         """获取最近几小时的论文"""
         return self.fetch_content(
             days_back=max(1, hours // 24),
             max_results=100
         )
     
-    def search_papers_by_keyword(self, keywords: List[str], max_results: int = 20) -> List[ContentItem]:
+    def search_papers_by_keyword(self, keywords: List[str], max_results: int = 20) -> List[ContentItemRaw]:
         """根据关键词搜索论文"""
         try:
             # 构建关键词查询
@@ -0,0 +1,159 @@
+"""
+FAISS检索索引
+从Chroma集合构建进程内HNSW索引，用于读多写少场景下的快速语义搜索
+"""
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class FaissSearchIndex:
+    """基于FAISS IndexHNSWFlat的内存检索索引
+
+    Chroma仍是唯一的数据源：索引在首次检索时从集合分页加载向量、文档和元数据，之后增量维护。
+    HNSW不支持删除，删除或覆盖的内容只将旧行标记为失效，检索时跳过；
+    失效行多于有效行时丢弃索引，下次检索前重建。
+    向量归一化后使用内积度量，得分即余弦相似度。
+    写线程与检索线程并发访问，所有操作由同一把锁保护。
+    """
+
+    def __init__(self, dimension: int, m: int = 32):
+        self.dimension = dimension
+        self.m = m
+        self._index = None
+        self._ids: List[str] = []
+        self._row_for_id: Dict[str, int] = {}
+        self._records: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._index is not None
+
+    def invalidate(self):
+        """丢弃当前索引，下次检索前重建"""
+        with self._lock:
+            self._index = None
+            self._ids = []
+            self._row_for_id = {}
+            self._records = {}
+
+    def ensure_built(self, collection, page_size: int = 1000) -> bool:
+        """索引尚未构建时分页读取Chroma集合构建索引，返回本次是否执行了构建"""
+        import faiss
+
+        with self._lock:
+            if self._index is not None:
+                return False
+
+            self._index = faiss.IndexHNSWFlat(self.dimension, self.m, faiss.METRIC_INNER_PRODUCT)
+            total = collection.count()
+            for offset in range(0, total, page_size):
+                page = collection.get(
+                    limit=page_size,
+                    offset=offset,
+                    include=["embeddings", "documents", "metadatas"]
+                )
+                if len(page["ids"]):
+                    self._append(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+            return True
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """追加新写入的内容，已存在的ID被忽略（与Chroma的add一致），索引尚未构建时忽略"""
+        with self._lock:
+            if self._index is None:
+                return
+
+            rows = [i for i, content_id in enumerate(ids) if content_id not in self._row_for_id]
+            if rows:
+                self._append(
+                    [ids[i] for i in rows],
+                    np.asarray(embeddings)[rows],
+                    [documents[i] for i in rows],
+                    [metadatas[i] for i in rows]
+                )
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """插入或覆盖内容，被覆盖的旧行标记为失效"""
+        with self._lock:
+            if self._index is None:
+                return
+            self._append(ids, embeddings, documents, metadatas)
+            self._compact_if_needed()
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """只更新元数据，向量和文档不变"""
+        with self._lock:
+            for content_id, metadata in zip(ids, metadatas):
+                record = self._records.get(content_id)
+                if record is not None:
+                    self._records[content_id] = (record[0], metadata)
+
+    def remove(self, ids: List[str]):
+        """删除内容，对应行标记为失效"""
+        with self._lock:
+            for content_id in ids:
+                self._row_for_id.pop(content_id, None)
+                self._records.pop(content_id, None)
+            self._compact_if_needed()
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float, str, Dict[str, Any]]]:
+        """返回(ID, 相似度, 文档, 元数据)列表，按相似度降序"""
+        with self._lock:
+            if self._index is None or not self._row_for_id:
+                return []
+
+            # 失效行可能占据前k名，按失效行数多取候选
+            dead = len(self._ids) - len(self._row_for_id)
+            scores, rows = self._index.search(self._normalize(query), min(k + dead, len(self._ids)))
+
+            results = []
+            for score, row in zip(scores[0], rows[0]):
+                if row < 0:
+                    continue
+                content_id = self._ids[row]
+                if self._row_for_id.get(content_id) != row:
+                    continue
+                document, metadata = self._records[content_id]
+                results.append((content_id, float(score), document, metadata))
+                if len(results) == k:
+                    break
+            return results
+
+    def _append(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        self._index.add(self._normalize(embeddings))
+        for content_id, document, metadata in zip(ids, documents, metadatas):
+            self._row_for_id[content_id] = len(self._ids)
+            self._ids.append(content_id)
+            self._records[content_id] = (document, metadata)
+
+    def _compact_if_needed(self):
+        # 失效行过多时检索需要多取大量候选，直接丢弃索引重建更划算
+        if len(self._ids) - len(self._row_for_id) > len(self._row_for_id):
+            self.invalidate()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(vectors / norms)
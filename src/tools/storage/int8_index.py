@@ -0,0 +1,191 @@
+"""
+INT8向量索引
+将embedding按向量标量量化为int8并保存在本地文件中，提供余弦相似度的线性扫描检索
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:  # 可选依赖
+    simsimd = None
+
+
+class Int8VectorIndex:
+    """基于int8量化向量的扁平索引
+
+    向量以追加方式写入 ``<path>.i8``（原始int8字节），ID按行写入 ``<path>.ids``，
+    删除的ID连同当时的行数追加到 ``<path>.del``。加载时应用删除记录并去掉被覆盖的旧行，重写压缩后的文件；
+    两个文件行数不一致（写入中途退出）时丢弃索引，由sync()从Chroma重建。
+    每个向量按自身最大绝对值缩放到[-127, 127]，余弦相似度与缩放无关，
+    因此无需保存缩放系数。安装了simsimd时使用其SIMD int8余弦内核，否则回退到numpy。
+    """
+
+    def __init__(self, path: Path, dimension: int):
+        self.dimension = dimension
+        self.vectors_path = path.with_suffix(".i8")
+        self.ids_path = path.with_suffix(".ids")
+        self.deleted_path = path.with_suffix(".del")
+        self.vectors_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._ids: List[str] = []
+        self._row_for_id: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_for_id)
+
+    @staticmethod
+    def quantize(vectors: np.ndarray) -> np.ndarray:
+        """将浮点向量逐行量化为int8"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        scale = np.abs(vectors).max(axis=1, keepdims=True)
+        scale[scale == 0] = 1.0
+        return np.round(vectors / scale * 127).astype(np.int8)
+
+    def sync(self, collection, page_size: int = 1000) -> bool:
+        """与Chroma集合数量不一致时从集合重建索引，返回是否执行了重建"""
+        if len(self) == collection.count():
+            return False
+        self.rebuild(collection, page_size)
+        return True
+
+    def rebuild(self, collection, page_size: int = 1000):
+        """分页读取Chroma集合中的全部向量，重写索引文件"""
+        with self._lock:
+            ids: List[str] = []
+            chunks: List[np.ndarray] = []
+            total = collection.count()
+            for offset in range(0, total, page_size):
+                page = collection.get(limit=page_size, offset=offset, include=["embeddings"])
+                if len(page["ids"]):
+                    ids.extend(page["ids"])
+                    chunks.append(self.quantize(page["embeddings"]))
+
+            vectors = np.concatenate(chunks) if chunks else np.empty((0, self.dimension), dtype=np.int8)
+            self._rewrite(ids, vectors)
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        """追加向量，已存在的ID以最新写入的向量为准"""
+        quantized = self.quantize(vectors)
+
+        with self._lock:
+            # 先写向量再写ID，两个文件一起刷新到磁盘；中途退出时加载会检测到行数不一致
+            with open(self.vectors_path, "ab") as vf, open(self.ids_path, "a", encoding="utf-8") as idf:
+                vf.write(quantized.tobytes())
+                vf.flush()
+                idf.write("".join(f"{content_id}\n" for content_id in ids))
+
+            for content_id in ids:
+                self._row_for_id[content_id] = len(self._ids)
+                self._ids.append(content_id)
+
+            # 文件已变化，下次检索时重新映射
+            self._vectors = None
+
+    def remove(self, ids: List[str]):
+        """从索引中移除ID，删除记录持久化到文件，下次加载时压缩"""
+        with self._lock:
+            # 同时记录删除时的行数，只删除此前写入的行，之后重新写入的同一ID不受影响
+            with open(self.deleted_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{content_id}\t{len(self._ids)}\n" for content_id in ids))
+            for content_id in ids:
+                self._row_for_id.pop(content_id, None)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """返回余弦相似度最高的k个(ID, 相似度)"""
+        with self._lock:
+            if not self._row_for_id:
+                return []
+
+            vectors = self._load_vectors()
+            # 只保留每个ID最新的一行
+            live_rows = np.fromiter(self._row_for_id.values(), dtype=np.int64)
+            ids = self._ids
+
+        query_i8 = self.quantize(query)
+        similarities = self._cosine_similarities(query_i8, vectors)
+
+        live_scores = similarities[live_rows]
+        k = min(k, len(live_rows))
+        top = np.argpartition(-live_scores, k - 1)[:k]
+        top = top[np.argsort(-live_scores[top])]
+
+        return [(ids[live_rows[i]], float(live_scores[i])) for i in top]
+
+    def _load(self):
+        """加载索引文件，应用删除记录并压缩"""
+        if not self.ids_path.exists():
+            return
+
+        ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        if size != len(ids) * self.dimension:
+            # 两个文件不一致，丢弃后保持为空，等待sync()从Chroma重建
+            for path in (self.vectors_path, self.ids_path, self.deleted_path):
+                if path.exists():
+                    path.unlink()
+            return
+
+        self._ids = ids
+        for row, content_id in enumerate(ids):
+            self._row_for_id[content_id] = row
+
+        if self.deleted_path.exists():
+            for line in self.deleted_path.read_text(encoding="utf-8").splitlines():
+                content_id, _, rows_at_delete = line.rpartition("\t")
+                if self._row_for_id.get(content_id, len(ids)) < int(rows_at_delete):
+                    del self._row_for_id[content_id]
+
+        if len(self._row_for_id) < len(self._ids):
+            live = sorted(self._row_for_id.items(), key=lambda item: item[1])
+            rows = np.fromiter((row for _, row in live), dtype=np.int64, count=len(live))
+            self._rewrite([content_id for content_id, _ in live], self._load_vectors()[rows])
+        elif self.deleted_path.exists():
+            self.deleted_path.unlink()
+
+    def _rewrite(self, ids: List[str], vectors: np.ndarray):
+        """写入临时文件后替换索引文件，并清空删除记录"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.int8)
+        vectors_tmp = self.vectors_path.with_suffix(".i8.tmp")
+        ids_tmp = self.ids_path.with_suffix(".ids.tmp")
+        vectors_tmp.write_bytes(vectors.tobytes())
+        ids_tmp.write_text("".join(f"{content_id}\n" for content_id in ids), encoding="utf-8")
+
+        # 释放旧文件的内存映射后再替换
+        self._vectors = None
+        os.replace(vectors_tmp, self.vectors_path)
+        os.replace(ids_tmp, self.ids_path)
+        if self.deleted_path.exists():
+            self.deleted_path.unlink()
+
+        self._ids = list(ids)
+        self._row_for_id = {content_id: row for row, content_id in enumerate(self._ids)}
+
+    def _load_vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            if self.vectors_path.stat().st_size == 0:
+                self._vectors = np.empty((0, self.dimension), dtype=np.int8)
+            else:
+                vectors = np.memmap(self.vectors_path, dtype=np.int8, mode="r")
+                self._vectors = vectors.reshape(-1, self.dimension)
+        return self._vectors
+
+    @staticmethod
+    def _cosine_similarities(query: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        if simsimd is not None:
+            distances = np.asarray(simsimd.cdist(query, vectors, metric="cosine"))
+            return 1.0 - distances.reshape(-1)
+
+        vectors = vectors.astype(np.int32)
+        query = query.reshape(-1).astype(np.int32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        norms[norms == 0] = 1.0
+        return (vectors @ query) / norms
@@ -2,16 +2,100 @@
 向量存储工具
 实现基于Chroma的向量存储和检索
 """
+import atexit
+import hashlib
+import os
+import platform
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
 import chromadb
-from typing import List, Optional, Dict, Any
+import numpy as np
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+from pathlib import Path
 from sentence_transformers import SentenceTransformer
 from langchain.callbacks.manager import CallbackManagerForToolRun
-import json
 
 from ..base import StorageTool, ToolResult
+from .faiss_index import FaissSearchIndex
+from .int8_index import Int8VectorIndex
 from ...core.models import ContentItem
-from ...core.config import config
-from ...core.exceptions import VectorStoreException
+from ...core.models_internal import ContentRecord
+from ...core.config import get_settings
+from ...core.exceptions import ConfigurationException, VectorStoreException
+
+# 元数据中的列表字段以JSON字符串存储，优先使用orjson
+try:
+    import orjson
+    
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode("utf-8")
+    
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+def _to_epoch_ms(value: datetime) -> int:
+    """将时间转换为UTC毫秒时间戳，无时区的时间按UTC处理"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _from_epoch_ms(metadata: Dict[str, Any]) -> datetime:
+    """从元数据还原发布时间，兼容旧版本写入的ISO字符串"""
+    if "published_at_ms" in metadata:
+        return datetime.fromtimestamp(metadata["published_at_ms"] / 1000, tz=timezone.utc)
+    return datetime.fromisoformat(metadata["published_at"])
+
+
+def published_between(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Optional[Dict[str, Any]]:
+    """构建按发布时间筛选的where条件（整数范围比较）"""
+    conditions = []
+    if start is not None:
+        conditions.append({"published_at_ms": {"$gte": _to_epoch_ms(start)}})
+    if end is not None:
+        conditions.append({"published_at_ms": {"$lt": _to_epoch_ms(end)}})
+    
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+# 内积空间集合名；旧版余弦空间集合在打开存储时由后台线程迁移
+COLLECTION_NAME = "news_content_ip"
+LEGACY_COLLECTION_NAME = "news_content"
+
+# 批量存储时最多允许多少个已编码的批次等待写线程写入，限制内存占用
+MAX_PENDING_WRITES = 2
+
+# Chroma拒绝单条数据时抛出的异常类型（元数据或向量不合法），其余异常视为暂时性错误
+_REJECTED_ROW_ERRORS = (ValueError, TypeError)
+
+# 分布统计在首次变更后延迟多少秒写入文件，合并连续写入产生的多次保存
+STATS_SAVE_DELAY = 5.0
+
+# 分页扫描集合（重建统计、构建索引）时每页读取的文档数
+COLLECTION_PAGE_SIZE = 1000
+
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """将embedding逐行归一化为单位向量（原地修改），内积即余弦相似度"""
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embeddings /= norms
+    return embeddings
 
 
 class ChromaVectorStoreTool(StorageTool):
@@ -22,6 +106,8 @@ class ChromaVectorStoreTool(StorageTool):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        config = get_settings()
+        self.vector_config = config.vector_store
         
         # 初始化Chroma客户端
         self.client = chromadb.PersistentClient(
@@ -29,17 +115,240 @@ class ChromaVectorStoreTool(StorageTool):
         )
         
         # 初始化embedding模型
-        self.embedding_model = SentenceTransformer(
-            config.vector_store.embedding_model
-        )
+        self.embedding_model = self._load_embedding_model(config.data_dir)
         
-        # 获取或创建集合
+        # 查询embedding的LRU缓存，搜索可能来自多个线程
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
+        # 获取或创建集合；embedding写入前已归一化，使用内积空间，查询时无需再计算范数
         self.collection = self.client.get_or_create_collection(
-            name="news_content",
-            metadata={"description": "AI新闻内容向量存储"}
+            name=COLLECTION_NAME,
+            metadata={"hnsw:space": "ip", "description": "AI新闻内容向量存储"}
         )
         
-        self.logger.info(f"Chroma向量存储初始化完成，集合文档数量: {self.collection.count()}")
+        # Chroma写入线程：所有对集合的写操作都在此线程中按提交顺序执行，批量存储时与embedding计算重叠
+        self._write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer")
+        
+        # store_content的写缓冲区，进程退出时自动写出
+        self._buffer_ids: List[str] = []
+        self._buffer_embeddings: List[np.ndarray] = []
+        self._buffer_documents: List[str] = []
+        self._buffer_metadatas: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.RLock()
+        
+        # 内容类型和来源分布，随写入/删除增量维护并持久化
+        self._stats_path = config.data_dir / "chroma_stats.json"
+        self._type_counts: Counter = Counter()
+        self._source_counts: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._stats_file_lock = threading.Lock()
+        self._stats_dirty = False
+        self._stats_timer: Optional[threading.Timer] = None
+        
+        # 文档数量缓存，避免每次搜索都查询SQLite；仅在启动和refresh()时读取集合
+        self._doc_count = self.collection.count()
+        self._load_stats(self._doc_count)
+        
+        # 可选的int8量化索引，与Chroma集合并行维护
+        self.int8_index = None
+        if self.vector_config.int8_index_enabled:
+            self.int8_index = Int8VectorIndex(
+                config.data_dir / "chroma_db" / COLLECTION_NAME,
+                self.vector_config.vector_dimension
+            )
+            # 索引为空（新启用）或与集合不一致时从Chroma补齐
+            if self.int8_index.sync(self.collection, page_size=COLLECTION_PAGE_SIZE):
+                self.logger.info(f"int8索引已从Chroma重建，文档数量: {len(self.int8_index)}")
+        
+        # 可选的FAISS HNSW检索索引，首次搜索时从集合构建
+        self.faiss_index = None
+        if self.vector_config.faiss_index_enabled:
+            self.faiss_index = FaissSearchIndex(self.vector_config.vector_dimension)
+        
+        # 旧版余弦空间集合在后台迁移，迁移完成前搜索结果只包含已迁移的内容
+        self._migration_stop = threading.Event()
+        self._migration_thread = None
+        if LEGACY_COLLECTION_NAME in self._collection_names():
+            self.logger.warning(f"检测到旧版余弦空间集合 {LEGACY_COLLECTION_NAME}，开始后台迁移")
+            self._migration_thread = threading.Thread(
+                target=self._migrate_in_background,
+                name="chroma-migration",
+                daemon=True
+            )
+            self._migration_thread.start()
+        
+        # 未显式调用close()时在进程退出前写出缓冲区；close()后取消注册，释放对实例的引用
+        self._closed = False
+        atexit.register(self.close)
+        
+        self.logger.info(f"Chroma向量存储初始化完成，集合文档数量: {self._doc_count}")
+    
+    def _collection_names(self) -> List[str]:
+        # chromadb 0.6起list_collections直接返回名称
+        return [
+            getattr(collection, "name", collection)
+            for collection in self.client.list_collections()
+        ]
+    
+    def _migrate_in_background(self):
+        try:
+            self.migrate_legacy_collection()
+        except VectorStoreException:
+            # 已记录日志；已迁移的内容会被跳过，下次打开时继续
+            pass
+    
+    def migrate_legacy_collection(self) -> int:
+        """将旧版余弦空间集合中的内容重新编码后写入内积空间集合，完成后删除旧集合
+        
+        旧集合中存储的文档即embedding文本，按页读取后重新生成归一化embedding，
+        元数据按当前格式重新构建。返回迁移的文档数量；存储关闭时中止并返回0。
+        """
+        if LEGACY_COLLECTION_NAME not in self._collection_names():
+            return 0
+        
+        try:
+            self.flush()
+            legacy = self.client.get_collection(LEGACY_COLLECTION_NAME)
+            total = legacy.count()
+            
+            for offset in range(0, total, COLLECTION_PAGE_SIZE):
+                if self._migration_stop.is_set():
+                    self.logger.info("存储已关闭，旧版集合迁移中止")
+                    return 0
+                
+                page = legacy.get(
+                    limit=COLLECTION_PAGE_SIZE,
+                    offset=offset,
+                    include=["documents", "metadatas"]
+                )
+                if not page["ids"]:
+                    continue
+                
+                # 跳过已迁移的内容，迁移中断后可重复执行
+                existing = set(self.collection.get(ids=page["ids"], include=[])["ids"])
+                rows = [i for i, doc_id in enumerate(page["ids"]) if doc_id not in existing]
+                if not rows:
+                    continue
+                
+                batch_ids = [page["ids"][i] for i in rows]
+                documents = [page["documents"][i] for i in rows]
+                metadatas = [
+                    self._build_metadata(
+                        self._content_from_record(content_id, document, page["metadatas"][i]),
+                        self._text_hash(document)
+                    )
+                    for content_id, document, i in zip(batch_ids, documents, rows)
+                ]
+                self._run_on_writer(
+                    self._write_batch,
+                    batch_ids,
+                    self._embed_documents(documents),
+                    documents,
+                    metadatas
+                )
+            
+            self.client.delete_collection(LEGACY_COLLECTION_NAME)
+            self.logger.info(f"旧版集合迁移完成，数量: {total}")
+            return total
+            
+        except Exception as e:
+            self.logger.error(f"旧版集合迁移失败: {str(e)}")
+            raise VectorStoreException(f"迁移旧版集合失败: {str(e)}")
+    
+    def _load_embedding_model(self, data_dir: Path) -> SentenceTransformer:
+        """按配置的后端加载embedding模型"""
+        model_name = self.vector_config.embedding_model
+        backend = self.vector_config.embedding_backend
+        
+        if backend == "torch":
+            model = self._apply_precision(SentenceTransformer(model_name))
+            if self.vector_config.embedding_compile:
+                model = self._compile_model(model)
+            return model
+        
+        if backend == "openvino":
+            # Intel CPU上使用OpenVINO推理，需要 sentence-transformers[openvino]
+            return SentenceTransformer(model_name, backend="openvino")
+        
+        if backend == "torch-int8":
+            # 动态INT8量化只支持CPU推理
+            model = SentenceTransformer(model_name, device="cpu")
+            return self._quantize_dynamic(model)
+        
+        if backend == "onnx-int8":
+            # 首次使用时导出动态INT8量化的ONNX模型并缓存到本地
+            quantization = self.vector_config.onnx_quantization
+            export_dir = data_dir / "onnx_models" / model_name.replace("/", "__")
+            file_name = f"onnx/model_qint8_{quantization}.onnx"
+            
+            if not (export_dir / file_name).exists():
+                # 需要 sentence-transformers[onnx] >= 3.2
+                from sentence_transformers import export_dynamic_quantized_onnx_model
+                
+                self.logger.info(f"导出量化ONNX模型: {model_name} -> {export_dir}")
+                model = SentenceTransformer(model_name, backend="onnx")
+                model.save_pretrained(str(export_dir))
+                export_dynamic_quantized_onnx_model(model, quantization, str(export_dir))
+            
+            return SentenceTransformer(
+                str(export_dir),
+                backend="onnx",
+                model_kwargs={"file_name": file_name}
+            )
+        
+        if backend == "model2vec":
+            # 静态词向量蒸馏模型，无注意力计算，CPU上编码极快，encode接口与SentenceTransformer兼容
+            from model2vec import StaticModel
+            
+            return StaticModel.from_pretrained(self.vector_config.model2vec_model)
+        
+        raise ConfigurationException(f"不支持的embedding后端: {backend}")
+    
+    def _apply_precision(self, model: SentenceTransformer) -> SentenceTransformer:
+        """在GPU上按配置切换为半精度推理（取值已由VectorStoreConfig校验）"""
+        precision = self.vector_config.embedding_precision
+        if precision == "fp32":
+            return model
+        
+        import torch
+        
+        if not torch.cuda.is_available():
+            # 同一份配置需要能在无GPU的开发/CI机器上启动，回退到fp32
+            self.logger.warning(f"未检测到GPU，忽略embedding精度配置: {precision}")
+            return model
+        
+        model = model.to("cuda")
+        return model.half() if precision == "fp16" else model.bfloat16()
+    
+    def _compile_model(self, model: SentenceTransformer) -> SentenceTransformer:
+        """使用torch.compile编译底层transformer并预热"""
+        import torch
+        
+        if int(torch.__version__.split(".")[0]) < 2:
+            self.logger.warning(f"torch {torch.__version__} 不支持torch.compile，跳过编译")
+            return model
+        
+        # 只编译内部的transformer模块，保留SentenceTransformer的encode接口
+        transformer = model[0]
+        transformer.auto_model = torch.compile(
+            transformer.auto_model,
+            mode="reduce-overhead",
+            dynamic=True
+        )
+        
+        # 首次调用触发编译，避免首个请求承担编译耗时
+        model.encode("warmup")
+        return model
+    
+    @staticmethod
+    def _quantize_dynamic(model: SentenceTransformer) -> SentenceTransformer:
+        """对模型的Linear层做动态INT8量化"""
+        import torch
+        
+        machine = platform.machine().lower()
+        torch.backends.quantized.engine = "qnnpack" if machine in ("arm64", "aarch64") else "fbgemm"
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
     
     def _execute(
         self,
@@ -56,39 +365,45 @@ class ChromaVectorStoreTool(StorageTool):
                 metadata={
                     "query": query,
                     "total_results": len(results),
-                    "collection_size": self.collection.count()
+                    "collection_size": self.document_count
                 }
             )
         except Exception as e:
             raise VectorStoreException(f"向量搜索失败: {str(e)}")
     
-    def store_content(self, content: ContentItem) -> str:
-        """存储内容项到向量数据库"""
+    def store_content(self, content: ContentRecord, mode: str = "add") -> str:
+        """存储内容项到向量数据库
+        
+        mode为"add"时先放入写缓冲区，累积到write_batch_size条或调用flush()时批量写入；
+        为"upsert"时立即在一次调用中插入或覆盖已有内容。
+        """
+        if mode not in ("add", "upsert"):
+            raise VectorStoreException(f"不支持的存储模式: {mode}")
+        
         try:
             # 生成embedding
             text_to_embed = self._prepare_text_for_embedding(content)
-            embedding = self.embedding_model.encode(text_to_embed).tolist()
-            
-            # 准备元数据
-            metadata = {
-                "title": content.title,
-                "source_name": content.source_name,
-                "content_type": content.content_type.value,
-                "published_at": content.published_at.isoformat(),
-                "quality_score": content.quality_score,
-                "url": content.url,
-                "authors": json.dumps(content.authors),
-                "categories": json.dumps(content.categories),
-                "tags": json.dumps(content.tags)
-            }
+            embedding = self._embed_documents([text_to_embed])[0]
+            metadata = self._build_metadata(content, self._text_hash(text_to_embed))
+            self._validate_record(embedding, metadata)
             
-            # 存储到Chroma
-            self.collection.add(
-                ids=[content.id],
-                embeddings=[embedding],
-                documents=[text_to_embed],
-                metadatas=[metadata]
-            )
+            if mode == "add":
+                with self._buffer_lock:
+                    self._buffer_ids.append(content.id)
+                    self._buffer_embeddings.append(embedding)
+                    self._buffer_documents.append(text_to_embed)
+                    self._buffer_metadatas.append(metadata)
+                    should_flush = len(self._buffer_ids) >= self.vector_config.write_batch_size
+                
+                if should_flush:
+                    self.flush()
+                
+                self.logger.info(f"内容已加入向量数据库写缓冲区: {content.id}")
+                return content.id
+            
+            # upsert前先写出缓冲区，保证写入顺序
+            self.flush()
+            self._run_on_writer(self._upsert_record, content.id, embedding, text_to_embed, metadata)
             
             self.logger.info(f"内容已存储到向量数据库: {content.id}")
             return content.id
@@ -97,9 +412,269 @@ class ChromaVectorStoreTool(StorageTool):
             self.logger.error(f"向量存储失败: {str(e)}")
             raise VectorStoreException(f"存储内容失败: {str(e)}")
     
+    def flush(self):
+        """将写缓冲区中的内容一次性写入Chroma
+        
+        写入成功后才清空缓冲区；写入失败时内容保留在缓冲区中，下次flush()时重试。
+        """
+        self._flush_buffer(self._run_on_writer)
+    
+    def _flush_buffer(self, run):
+        """通过run(fn, *args)执行缓冲区写入：正常情况下交给写线程，关闭时在当前线程执行"""
+        with self._buffer_lock:
+            if not self._buffer_ids:
+                return
+            
+            ids = list(self._buffer_ids)
+            pending = run(
+                self._write_rows,
+                ids,
+                np.stack(self._buffer_embeddings),
+                list(self._buffer_documents),
+                list(self._buffer_metadatas)
+            )
+            
+            # 只保留因暂时性错误未写入的内容，下次flush()时重试
+            self._buffer_ids[:] = [self._buffer_ids[i] for i in pending]
+            self._buffer_embeddings[:] = [self._buffer_embeddings[i] for i in pending]
+            self._buffer_documents[:] = [self._buffer_documents[i] for i in pending]
+            self._buffer_metadatas[:] = [self._buffer_metadatas[i] for i in pending]
+        
+        if pending:
+            raise VectorStoreException(f"写缓冲区中 {len(pending)} 条内容写入失败，已保留待重试")
+        self.logger.info(f"写缓冲区已写入向量数据库，数量: {len(ids)}")
+    
+    def _write_rows(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> List[int]:
+        """整批写入，失败时逐条重试（在写线程中执行）
+        
+        被Chroma拒绝的内容记录日志后丢弃，避免一条坏数据阻塞整个缓冲区；
+        返回因暂时性错误未写入的行下标。
+        """
+        try:
+            self._write_batch(ids, embeddings, documents, metadatas)
+            return []
+        except Exception as e:
+            self.logger.warning(f"批量写入失败，改为逐条写入: {str(e)}")
+        
+        pending = []
+        for i, content_id in enumerate(ids):
+            try:
+                self._write_batch([content_id], embeddings[i:i + 1], [documents[i]], [metadatas[i]])
+            except _REJECTED_ROW_ERRORS as e:
+                self.logger.error(f"内容被向量数据库拒绝，已丢弃: {content_id}, 错误: {str(e)}")
+            except Exception as e:
+                self.logger.warning(f"内容写入失败，保留待重试: {content_id}, 错误: {str(e)}")
+                pending.append(i)
+        return pending
+    
+    def _validate_record(self, embedding: np.ndarray, metadata: Dict[str, Any]):
+        """写入缓冲区前校验向量和元数据，使坏数据在其自身的调用中报错"""
+        dimension = self.vector_config.vector_dimension
+        if embedding.shape != (dimension,) or not np.isfinite(embedding).all():
+            raise VectorStoreException(f"embedding维度应为{dimension}且不含NaN/Inf，实际形状: {embedding.shape}")
+        for key, value in metadata.items():
+            # Chroma元数据只接受str、int、float、bool，不接受None
+            if not isinstance(value, (str, int, float, bool)):
+                raise VectorStoreException(f"元数据字段 {key} 的值无效: {value!r}")
+    
+    def store_contents(self, contents: Iterable[ContentRecord]) -> List[str]:
+        """批量存储内容项
+        
+        按write_batch_size分块：当前线程编码下一块的同时，后台写线程把上一块写入Chroma，
+        embedding计算与Chroma写入相互重叠。所有块写入完成后返回。
+        """
+        batch_size = self.vector_config.write_batch_size
+        iterator = iter(contents)
+        pending: List[Future] = []
+        ids: List[str] = []
+        
+        try:
+            # 先写出单条写入的缓冲区，保证写入顺序
+            self.flush()
+            
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                
+                batch_ids = [content.id for content in batch]
+                documents = [self._prepare_text_for_embedding(content) for content in batch]
+                metadatas = [
+                    self._build_metadata(content, self._text_hash(document))
+                    for content, document in zip(batch, documents)
+                ]
+                embeddings = self._embed_documents(documents)
+                for embedding, metadata in zip(embeddings, metadatas):
+                    self._validate_record(embedding, metadata)
+                
+                # Chroma不支持并发写入，写线程池只有一个线程，保证写入顺序
+                pending.append(self._write_pool.submit(
+                    self._write_batch, batch_ids, embeddings, documents, metadatas
+                ))
+                ids.extend(batch_ids)
+                
+                # 写入跟不上编码时等待最早的批次，避免所有已编码的批次堆积在内存中
+                while len(pending) > MAX_PENDING_WRITES:
+                    pending.pop(0).result()
+            
+            for future in pending:
+                future.result()
+            
+            self.logger.info(f"批量存储到向量数据库完成，数量: {len(ids)}")
+            return ids
+            
+        except Exception as e:
+            self.logger.error(f"批量向量存储失败: {str(e)}")
+            raise VectorStoreException(f"批量存储内容失败: {str(e)}")
+    
+    def _run_on_writer(self, fn, *args):
+        """在写线程中执行写操作并等待完成，与批量写入共用同一顺序"""
+        return self._write_pool.submit(fn, *args).result()
+    
+    def _upsert_record(
+        self,
+        content_id: str,
+        embedding: np.ndarray,
+        document: str,
+        metadata: Dict[str, Any],
+        existing: Optional[Dict[str, Any]] = None
+    ):
+        """插入或覆盖单条内容（在写线程中执行），existing为调用方已读取的旧记录"""
+        if existing is None:
+            existing = self.collection.get(ids=[content_id], include=["metadatas"])
+        self._mark_stats_dirty()
+        self.collection.upsert(
+            ids=[content_id],
+            embeddings=[embedding],
+            documents=[document],
+            metadatas=[metadata]
+        )
+        self._update_stats(added=[metadata], removed=existing["metadatas"])
+        
+        if self.faiss_index is not None:
+            self.faiss_index.upsert([content_id], embedding[None, :], [document], [metadata])
+        if self.int8_index is not None:
+            self.int8_index.add([content_id], embedding[None, :])
+    
+    def _delete_record(self, content_id: str):
+        """删除单条内容（在写线程中执行）"""
+        existing = self.collection.get(ids=[content_id], include=["metadatas"])
+        self._mark_stats_dirty()
+        self.collection.delete(ids=[content_id])
+        self._update_stats(removed=existing["metadatas"])
+        
+        if self.faiss_index is not None:
+            self.faiss_index.remove([content_id])
+        if self.int8_index is not None:
+            self.int8_index.remove([content_id])
+    
+    def _update_metadata_record(
+        self,
+        content: ContentRecord,
+        text_hash: str
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """文本未变化时只更新元数据（在写线程中执行）
+        
+        返回(是否已更新, 读取到的旧记录)，未更新时旧记录交给后续upsert复用，避免重复读取。
+        """
+        existing = self.collection.get(ids=[content.id], include=["metadatas"])
+        if not existing["ids"] or existing["metadatas"][0].get("text_hash") != text_hash:
+            return False, existing
+        
+        metadata = self._build_metadata(content, text_hash)
+        self._mark_stats_dirty()
+        self.collection.update(ids=[content.id], metadatas=[metadata])
+        self._update_stats(added=[metadata], removed=existing["metadatas"])
+        if self.faiss_index is not None:
+            self.faiss_index.update_metadata([content.id], [metadata])
+        return True, existing
+    
+    def _write_batch(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """将一批已编码的内容写入Chroma（在写线程中执行）
+        
+        Chroma会忽略已存在的ID，这里先过滤掉它们（批内重复的ID只保留第一条），
+        使索引和分布统计只计入实际插入的内容。
+        """
+        existing = set(self.collection.get(ids=list(set(ids)), include=[])["ids"])
+        rows = []
+        for i, content_id in enumerate(ids):
+            if content_id not in existing:
+                existing.add(content_id)
+                rows.append(i)
+        if not rows:
+            return
+        if len(rows) < len(ids):
+            ids = [ids[i] for i in rows]
+            embeddings = embeddings[rows]
+            documents = [documents[i] for i in rows]
+            metadatas = [metadatas[i] for i in rows]
+        
+        self._mark_stats_dirty()
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            documents=documents,
+            metadatas=metadatas
+        )
+        
+        if self.int8_index is not None:
+            self.int8_index.add(ids, embeddings)
+        if self.faiss_index is not None:
+            self.faiss_index.add(ids, embeddings, documents, metadatas)
+        
+        self._update_stats(added=metadatas)
+    
+    def close(self):
+        """写出缓冲区，等待未完成的写入，持久化统计并释放后台线程；重复调用无效果"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        
+        self._migration_stop.set()
+        if self._migration_thread is not None:
+            self._migration_thread.join()
+        
+        # 进程退出时concurrent.futures会先于atexit回调关闭所有线程池，无法再提交任务；
+        # 先等待写线程完成已提交的写入，再在当前线程写出缓冲区
+        self._write_pool.shutdown(wait=True)
+        try:
+            self._flush_buffer(lambda fn, *args: fn(*args))
+        except Exception as e:
+            # 进程退出时无法重试，记录未写入的内容ID以便重新导入
+            with self._buffer_lock:
+                self.logger.error(
+                    f"关闭时写缓冲区写入失败，{len(self._buffer_ids)}条内容未存储: "
+                    f"{self._buffer_ids}, 错误: {str(e)}"
+                )
+            raise VectorStoreException(f"写缓冲区写入失败: {str(e)}")
+        finally:
+            if self._stats_timer is not None:
+                self._stats_timer.cancel()
+            self._save_stats()
+    
+    def __enter__(self) -> "ChromaVectorStoreTool":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
     def retrieve_content(self, content_id: str) -> Optional[ContentItem]:
         """根据ID检索内容"""
         try:
+            self.flush()
             results = self.collection.get(
                 ids=[content_id],
                 include=["documents", "metadatas"]
@@ -108,23 +683,10 @@ class ChromaVectorStoreTool(StorageTool):
             if not results["ids"]:
                 return None
             
-            # 重构ContentItem（简化版本，主要用于搜索结果）
-            metadata = results["metadatas"][0]
-            document = results["documents"][0]
-            
-            return ContentItem(
-                id=content_id,
-                title=metadata["title"],
-                content=document,
-                url=metadata["url"],
-                content_type=metadata["content_type"],
-                source_id="",  # 这里需要从其他地方获取
-                source_name=metadata["source_name"],
-                authors=json.loads(metadata.get("authors", "[]")),
-                categories=json.loads(metadata.get("categories", "[]")),
-                tags=json.loads(metadata.get("tags", "[]")),
-                published_at=datetime.fromisoformat(metadata["published_at"]),
-                quality_score=metadata.get("quality_score", 0.0)
+            return self._content_from_record(
+                content_id,
+                results["documents"][0],
+                results["metadatas"][0]
             )
             
         except Exception as e:
@@ -140,8 +702,17 @@ class ChromaVectorStoreTool(StorageTool):
     ) -> List[Dict[str, Any]]:
         """语义搜索内容"""
         try:
+            self.flush()
             # 生成查询embedding
-            query_embedding = self.embedding_model.encode(query).tolist()
+            query_embedding = self._embed_query(query)
+            
+            # 无过滤条件时走进程内FAISS索引，不访问Chroma
+            if self.faiss_index is not None and where is None:
+                return self._search_faiss_index(query_embedding, n_results)
+            
+            # 无过滤条件时走int8索引，再从Chroma取回文档和元数据
+            if self.int8_index is not None and where is None:
+                return self._search_int8_index(query_embedding, n_results)
             
             # 执行搜索
             results = self.collection.query(
@@ -158,7 +729,8 @@ class ChromaVectorStoreTool(StorageTool):
                     "id": doc_id,
                     "content": results["documents"][0][i],
                     "metadata": results["metadatas"][0][i],
-                    "similarity_score": 1 - results["distances"][0][i],  # 转换距离为相似度
+                    # 内积空间的距离为1 - 内积，单位向量的内积即余弦相似度
+                    "similarity_score": 1 - results["distances"][0][i],
                 }
                 search_results.append(result)
             
@@ -169,19 +741,69 @@ class ChromaVectorStoreTool(StorageTool):
             self.logger.error(f"向量搜索失败: {str(e)}")
             raise VectorStoreException(f"搜索失败: {str(e)}")
     
+    def _search_faiss_index(self, query_embedding: np.ndarray, n_results: int) -> List[Dict[str, Any]]:
+        """使用FAISS索引检索，索引未构建或已丢弃时先从Chroma构建"""
+        if self.faiss_index.ensure_built(self.collection, page_size=COLLECTION_PAGE_SIZE):
+            self.logger.info(f"FAISS索引构建完成，文档数量: {self._doc_count}")
+        
+        search_results = [
+            {
+                "id": doc_id,
+                "content": document,
+                "metadata": metadata,
+                "similarity_score": score,
+            }
+            for doc_id, score, document, metadata in self.faiss_index.search(query_embedding, n_results)
+        ]
+        
+        self.logger.info(f"FAISS索引搜索完成，结果数量: {len(search_results)}")
+        return search_results
+    
+    def _search_int8_index(self, query_embedding: np.ndarray, n_results: int) -> List[Dict[str, Any]]:
+        """使用int8索引检索top-K，再从Chroma批量获取文档"""
+        hits = self.int8_index.search(query_embedding, n_results)
+        if not hits:
+            return []
+        
+        results = self.collection.get(
+            ids=[doc_id for doc_id, _ in hits],
+            include=["documents", "metadatas"]
+        )
+        found = {
+            doc_id: (results["documents"][i], results["metadatas"][i])
+            for i, doc_id in enumerate(results["ids"])
+        }
+        
+        search_results = []
+        for doc_id, score in hits:
+            # 已从Chroma删除的内容会被跳过
+            if doc_id not in found:
+                continue
+            document, metadata = found[doc_id]
+            search_results.append({
+                "id": doc_id,
+                "content": document,
+                "metadata": metadata,
+                "similarity_score": score,
+            })
+        
+        self.logger.info(f"int8索引搜索完成，结果数量: {len(search_results)}")
+        return search_results
+    
     def search_similar_content(
         self,
-        content_item: ContentItem,
+        content_item: ContentRecord,
         n_results: int = 5,
         exclude_self: bool = True
     ) -> List[Dict[str, Any]]:
         """查找相似内容"""
         try:
+            self.flush()
             # 生成内容的embedding
             text_to_embed = self._prepare_text_for_embedding(content_item)
-            embedding = self.embedding_model.encode(text_to_embed).tolist()
+            embedding = self._embed_documents([text_to_embed])[0]
             
-            # 执行相似性搜索
+            # 向量已归一化，Chroma返回的内积距离即精确得分，多取一条用于排除自身
             results = self.collection.query(
                 query_embeddings=[embedding],
                 n_results=n_results + (1 if exclude_self else 0),
@@ -193,14 +815,12 @@ class ChromaVectorStoreTool(StorageTool):
                 # 排除自身
                 if exclude_self and doc_id == content_item.id:
                     continue
-                
-                result = {
+                search_results.append({
                     "id": doc_id,
                     "content": results["documents"][0][i],
                     "metadata": results["metadatas"][0][i],
                     "similarity_score": 1 - results["distances"][0][i],
-                }
-                search_results.append(result)
+                })
             
             return search_results[:n_results]
             
@@ -211,7 +831,8 @@ class ChromaVectorStoreTool(StorageTool):
     def delete_content(self, content_id: str) -> bool:
         """删除内容"""
         try:
-            self.collection.delete(ids=[content_id])
+            self.flush()
+            self._run_on_writer(self._delete_record, content_id)
             self.logger.info(f"内容已从向量数据库删除: {content_id}")
             return True
             
@@ -219,13 +840,25 @@ class ChromaVectorStoreTool(StorageTool):
             self.logger.error(f"删除内容失败: {str(e)}")
             return False
     
-    def update_content(self, content: ContentItem) -> bool:
+    def update_content(self, content: ContentRecord) -> bool:
         """更新内容"""
         try:
-            # 先删除旧内容
-            self.delete_content(content.id)
-            # 再添加新内容
-            self.store_content(content)
+            self.flush()
+            text_to_embed = self._prepare_text_for_embedding(content)
+            text_hash = self._text_hash(text_to_embed)
+            
+            # 文本未变化时只更新元数据，跳过embedding计算
+            updated, existing = self._run_on_writer(self._update_metadata_record, content, text_hash)
+            if updated:
+                return True
+            
+            # 单次upsert，避免删除与重新添加之间读到缺失的文档；复用上面读取到的旧记录
+            embedding = self._embed_documents([text_to_embed])[0]
+            metadata = self._build_metadata(content, text_hash)
+            self._validate_record(embedding, metadata)
+            self._run_on_writer(
+                self._upsert_record, content.id, embedding, text_to_embed, metadata, existing
+            )
             return True
             
         except Exception as e:
@@ -233,39 +866,189 @@ class ChromaVectorStoreTool(StorageTool):
             return False
     
     def get_collection_stats(self) -> Dict[str, Any]:
-        """获取集合统计信息"""
+        """获取集合统计信息（分布统计由写入和删除增量维护，无需扫描集合）"""
         try:
-            count = self.collection.count()
+            self.flush()
             
-            # 获取一些样本数据来分析
-            sample_results = self.collection.get(
-                limit=min(100, count),
-                include=["metadatas"]
-            )
-            
-            # 统计内容类型分布
-            content_types = {}
-            sources = {}
-            
-            for metadata in sample_results.get("metadatas", []):
-                content_type = metadata.get("content_type", "unknown")
-                source_name = metadata.get("source_name", "unknown")
-                
-                content_types[content_type] = content_types.get(content_type, 0) + 1
-                sources[source_name] = sources.get(source_name, 0) + 1
+            with self._stats_lock:
+                count = self._doc_count
+                content_types = dict(self._type_counts)
+                sources = dict(self._source_counts)
             
             return {
                 "total_documents": count,
                 "content_type_distribution": content_types,
                 "source_distribution": sources,
-                "embedding_dimension": config.vector_store.vector_dimension
+                "embedding_dimension": self.vector_config.vector_dimension
             }
             
         except Exception as e:
             self.logger.error(f"获取统计信息失败: {str(e)}")
             return {"error": str(e)}
     
-    def _prepare_text_for_embedding(self, content: ContentItem) -> str:
+    @property
+    def document_count(self) -> int:
+        """已写入Chroma的文档数量（不含写缓冲区中的内容）"""
+        return self._doc_count
+    
+    def refresh(self):
+        """从Chroma重新读取文档数量"""
+        self.flush()
+        with self._stats_lock:
+            self._doc_count = self.collection.count()
+    
+    def _update_stats(
+        self,
+        added: Optional[List[Dict[str, Any]]] = None,
+        removed: Optional[List[Dict[str, Any]]] = None
+    ):
+        """按写入/删除的元数据增量更新分布统计（延迟持久化，见_mark_stats_dirty）"""
+        with self._stats_lock:
+            for metadata in added or []:
+                self._type_counts[metadata.get("content_type", "unknown")] += 1
+                self._source_counts[metadata.get("source_name", "unknown")] += 1
+            for metadata in removed or []:
+                self._type_counts[metadata.get("content_type", "unknown")] -= 1
+                self._source_counts[metadata.get("source_name", "unknown")] -= 1
+            self._doc_count += len(added or []) - len(removed or [])
+            # 移除计数归零的键
+            self._type_counts += Counter()
+            self._source_counts += Counter()
+    
+    def _load_stats(self, count: int):
+        """加载持久化的分布统计，与集合不一致时分页扫描集合重建
+        
+        统计文件在每次写入Chroma前标记为未保存(clean=false)，延迟保存时清除标记；
+        只有标记为已保存、且总数和两种分布的合计都与集合数量一致时才直接使用。
+        """
+        if self._stats_path.exists():
+            try:
+                data = _json_loads(self._stats_path.read_text(encoding="utf-8"))
+                type_counts = Counter(data["content_type_distribution"])
+                source_counts = Counter(data["source_distribution"])
+                if (
+                    data.get("clean")
+                    and data.get("total_documents") == count
+                    and sum(type_counts.values()) == count
+                    and sum(source_counts.values()) == count
+                ):
+                    self._type_counts = type_counts
+                    self._source_counts = source_counts
+                    return
+            except Exception as e:
+                self.logger.warning(f"统计文件读取失败，将重新统计: {str(e)}")
+        
+        for offset in range(0, count, COLLECTION_PAGE_SIZE):
+            page = self.collection.get(limit=COLLECTION_PAGE_SIZE, offset=offset, include=["metadatas"])
+            self._update_stats(added=page["metadatas"])
+        # 扫描过程中累加的文档数以集合实际数量为准
+        self._doc_count = count
+        self._save_stats()
+    
+    def _mark_stats_dirty(self):
+        """写入Chroma前调用：在统计文件中标记未保存，并安排STATS_SAVE_DELAY秒后保存
+        
+        已处于未保存状态时直接返回，连续写入只产生一次文件写入。
+        """
+        with self._stats_file_lock:
+            if self._stats_dirty:
+                return
+            self._stats_dirty = True
+            self._write_stats_file(clean=False)
+        
+        self._stats_timer = threading.Timer(STATS_SAVE_DELAY, self._save_stats)
+        self._stats_timer.daemon = True
+        self._stats_timer.start()
+    
+    def _save_stats(self):
+        """持久化分布统计并清除未保存标记"""
+        with self._stats_file_lock:
+            self._stats_dirty = False
+            self._write_stats_file(clean=True)
+    
+    def _write_stats_file(self, clean: bool):
+        """写入临时文件后替换统计文件，避免中途退出留下不完整的文件"""
+        with self._stats_lock:
+            data = {
+                "clean": clean,
+                "total_documents": self._doc_count,
+                "content_type_distribution": dict(self._type_counts),
+                "source_distribution": dict(self._source_counts),
+            }
+        self._stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._stats_path.with_suffix(".json.tmp")
+        tmp_path.write_text(_json_dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self._stats_path)
+    
+    def _embed_documents(self, documents: List[str]) -> np.ndarray:
+        """批量生成文档embedding，返回float32二维数组，可直接传给Chroma"""
+        embeddings = self.embedding_model.encode(
+            documents,
+            batch_size=self.vector_config.embedding_batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        # 各后端均支持的归一化方式（model2vec的encode不接受normalize_embeddings）
+        return _normalize_rows(embeddings.astype(np.float32))
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """生成查询embedding，重复查询直接命中LRU缓存"""
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(query)
+            if embedding is not None:
+                self._query_cache.move_to_end(query)
+                return embedding
+        
+        embedding = self.embedding_model.encode(query, convert_to_numpy=True)
+        embedding = _normalize_rows(embedding.astype(np.float32))
+        
+        with self._query_cache_lock:
+            self._query_cache[query] = embedding
+            self._query_cache.move_to_end(query)
+            if len(self._query_cache) > self.vector_config.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return embedding
+    
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """计算embedding文本的摘要，用于判断文本是否变化"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _build_metadata(content: ContentRecord, text_hash: str) -> Dict[str, Any]:
+        """构建存储到Chroma的元数据"""
+        return {
+            "text_hash": text_hash,
+            "title": content.title,
+            "source_name": content.source_name,
+            "content_type": content.content_type.value,
+            "published_at_ms": _to_epoch_ms(content.published_at),
+            "quality_score": content.quality_score,
+            "url": content.url,
+            "authors": _json_dumps(content.authors),
+            "categories": _json_dumps(content.categories),
+            "tags": _json_dumps(content.tags)
+        }
+    
+    @staticmethod
+    def _content_from_record(content_id: str, document: str, metadata: Dict[str, Any]) -> ContentItem:
+        """由Chroma中的文档和元数据重构ContentItem（简化版本，主要用于搜索结果和集合迁移）"""
+        return ContentItem(
+            id=content_id,
+            title=metadata["title"],
+            content=document,
+            url=metadata["url"],
+            content_type=metadata["content_type"],
+            source_id="",  # 这里需要从其他地方获取
+            source_name=metadata["source_name"],
+            authors=_json_loads(metadata.get("authors", "[]")),
+            categories=_json_loads(metadata.get("categories", "[]")),
+            tags=_json_loads(metadata.get("tags", "[]")),
+            published_at=_from_epoch_ms(metadata),
+            quality_score=metadata.get("quality_score", 0.0)
+        )
+    
+    def _prepare_text_for_embedding(self, content: ContentRecord) -> str:
         """准备用于embedding的文本"""
         # 组合标题、摘要和部分内容
         text_parts = [content.title]
@@ -273,9 +1056,9 @@ class ChromaVectorStoreTool(StorageTool):
         if content.summary:
             text_parts.append(content.summary)
         
-        # 截取内容的前1000个字符
+        # 截取内容的前max_input_chars个字符（可配置），超出部分也会被模型的token上限截断
         if content.content:
-            text_parts.append(content.content[:1000])
+            text_parts.append(content.content[:self.vector_config.max_input_chars])
         
         # 添加作者和标签信息
         if content.authors: